@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+DIS PDU Sender Benchmark Script
+This script measures the hot stages of sendPdu.py against a local UDP sink on loopback,
+so that changes to the sender can be compared for speed before they are deployed.
+
+Stages measured (each at every requested entity count where it applies):
+  - build:<pdu>   PDU construction and serialization for each send_*_pdu function (no network I/O)
+  - update        update_entity_position over all entities
+  - select        sendPdu.select_events for every entity (selection only, nothing is sent)
+  - socket_send   raw udpSocket.sendto of pre-serialized PDUs to the sink
+  - e2e           sendPdu.simulate_tick, the same tick main() runs, sent to the sink
+
+With sendPdu's default probabilities almost no events fire per tick, so --event-scale
+multiplies every *_PROBABILITY constant during the select and e2e stages to exercise
+target selection and all nine event senders.
+
+Results are written as JSON (schema_version 2). Use --profile DIR to write cProfile output
+for the end-to-end runs (view with snakeviz, or render a flamegraph with flameprof), and
+--baseline FILE to fail when throughput drops more than --max-regression percent.
+
+Ensure that the opendis package is installed and properly configured.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import json
+import multiprocessing
+import os
+import platform
+import pstats
+import random
+import socket
+import statistics
+import sys
+import time
+
+import sendPdu
+
+SCHEMA_VERSION = 2
+DEFAULT_ENTITY_COUNTS = [5, 50, 500]
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME_SECONDS = 0.3
+DEFAULT_MAX_REGRESSION_PERCENT = 10.0
+DEFAULT_EVENT_SCALE = 1.0
+DEFAULT_SEED = 1234
+SINK_ADDRESS = "127.0.0.1"
+SINK_RECV_BUFFER_BYTES = 4 * 1024 * 1024
+SINK_STARTUP_TIMEOUT_SECONDS = 5.0
+SINK_SHUTDOWN_TIMEOUT_SECONDS = 5.0
+# Settings that must match for a baseline to be comparable
+COMPARABLE_CONFIG_KEYS = ["entities", "repeat", "min_time", "event_scale", "seed"]
+
+# (send function name in sendPdu, number of entity arguments it takes)
+PDU_SENDERS = [
+    ("send_entity_state_pdu", 1),
+    ("send_fire_pdu", 2),
+    ("send_collision_pdu", 2),
+    ("send_detonation_pdu", 2),
+    ("send_data_pdu", 2),
+    ("send_action_request_pdu", 2),
+    ("send_start_resume_pdu", 0),
+    ("send_set_data_pdu", 1),
+    ("send_designator_pdu", 1),
+    ("send_emission_pdu", 1),
+]
+
+class NullSocket:
+    """Stands in for sendPdu.udpSocket so build stages exclude network I/O."""
+
+    def __init__(self):
+        self.sent = 0
+        self.last_data = None
+
+    def sendto(self, data, address):
+        self.sent += 1
+        self.last_data = data
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def _run_sink(conn, stop):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SINK_RECV_BUFFER_BYTES)
+    sock.bind((SINK_ADDRESS, 0))
+    sock.settimeout(0.1)
+    conn.send(sock.getsockname()[1])
+    packets = received_bytes = 0
+    while not stop.is_set():
+        try:
+            data = sock.recv(65535)
+        except socket.timeout:
+            continue
+        packets += 1
+        received_bytes += len(data)
+    # Drain whatever is still queued before reporting.
+    sock.setblocking(False)
+    while True:
+        try:
+            data = sock.recv(65535)
+        except BlockingIOError:
+            break
+        packets += 1
+        received_bytes += len(data)
+    sock.close()
+    conn.send((packets, received_bytes))
+
+
+class UdpSink:
+    """
+    Counts datagrams received on a loopback port. The receiver runs in its own process
+    so it does not compete for the GIL with the sender being timed.
+    """
+
+    def __init__(self):
+        self.port = None
+        self.packets = 0
+        self.bytes = 0
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._stop = multiprocessing.Event()
+        self._process = multiprocessing.Process(target=_run_sink, args=(child_conn, self._stop), daemon=True)
+
+    def __enter__(self):
+        self._process.start()
+        if not self._conn.poll(SINK_STARTUP_TIMEOUT_SECONDS):
+            self._process.terminate()
+            raise RuntimeError("UDP sink process did not start.")
+        self.port = self._conn.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._conn.poll(SINK_SHUTDOWN_TIMEOUT_SECONDS):
+            self.packets, self.bytes = self._conn.recv()
+        self._process.join(SINK_SHUTDOWN_TIMEOUT_SECONDS)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+@contextlib.contextmanager
+def sender_socket(sock):
+    """Temporarily swaps the socket used by the sendPdu send functions."""
+    original = sendPdu.udpSocket
+    sendPdu.udpSocket = sock
+    try:
+        yield sock
+    finally:
+        sendPdu.udpSocket = original
+
+
+@contextlib.contextmanager
+def scaled_event_probabilities(scale):
+    """Temporarily multiplies every *_PROBABILITY constant in sendPdu by scale."""
+    names = [name for name in vars(sendPdu) if name.endswith("_PROBABILITY")]
+    original = {name: getattr(sendPdu, name) for name in names}
+    for name, probability in original.items():
+        setattr(sendPdu, name, probability * scale)
+    try:
+        yield
+    finally:
+        for name, probability in original.items():
+            setattr(sendPdu, name, probability)
+
+
+def make_entities(count, seed):
+    # Reseed per stage so every stage starts from the same entities and event sequence,
+    # however many random draws earlier stages made while calibrating.
+    random.seed(seed)
+    sendPdu.NUM_SIMULATED_ENTITIES = count
+    sendPdu.initialize_entities()
+    return list(sendPdu.simulated_entities)
+
+
+def sender_args(arity, entities):
+    return tuple(entities[:arity])
+
+
+def measure(func, repeat, min_time):
+    """
+    Calls func(iterations) -> ops in batches sized to take at least min_time,
+    and returns ops/second for each of `repeat` batches.
+    """
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        func(iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1 << 24:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    total_ops = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = func(iterations)
+        elapsed = time.perf_counter() - start
+        total_ops += ops
+        samples.append(ops / elapsed if elapsed > 0 else float('inf'))
+    return iterations, total_ops, samples
+
+
+def make_result(name, entities, unit, iterations, total_ops, samples, extra=None):
+    result = {
+        "name": name,
+        "entities": entities,
+        "unit": unit,
+        "iterations_per_sample": iterations,
+        "total_ops": total_ops,
+        "ops_per_sec_median": statistics.median(samples),
+        "ops_per_sec_min": min(samples),
+        "ops_per_sec_max": max(samples),
+        "ns_per_op_median": 1e9 / statistics.median(samples),
+    }
+    if extra:
+        result.update(extra)
+    return result
+
+
+def bench_build(args):
+    results = []
+    entities = make_entities(2, args.seed)
+    null_socket = NullSocket()
+    with sender_socket(null_socket):
+        for sender_name, arity in PDU_SENDERS:
+            sender = getattr(sendPdu, sender_name)
+            sender_arguments = sender_args(arity, entities)
+            null_socket.sent = 0
+            sender(*sender_arguments)
+            if null_socket.sent != 1:
+                raise RuntimeError(f"{sender_name} did not produce a PDU; check the opendis installation.")
+            pdu_bytes = len(null_socket.last_data)
+
+            def run(iterations, sender=sender, sender_arguments=sender_arguments):
+                for _ in range(iterations):
+                    sender(*sender_arguments)
+                return iterations
+
+            results.append(make_result(
+                f"build:{sender_name}", None, "pdu", *measure(run, args.repeat, args.min_time),
+                extra={"pdu_bytes": pdu_bytes},
+            ))
+    return results
+
+
+def bench_update(count, args):
+    entities = make_entities(count, args.seed)
+    dt = sendPdu.get_tick_sleep_seconds(sendPdu.get_espdu_send_interval(), count)
+    update = sendPdu.update_entity_position
+
+    def run(iterations):
+        for _ in range(iterations):
+            for entity in entities:
+                update(entity, dt)
+        return iterations * len(entities)
+
+    return make_result("update", count, "entity_update", *measure(run, args.repeat, args.min_time))
+
+
+def bench_select(count, args):
+    entities = make_entities(count, args.seed)
+    interval = sendPdu.get_espdu_send_interval()
+    dt = sendPdu.get_tick_sleep_seconds(interval, count)
+    select_events = sendPdu.select_events
+    # [events selected, entity ticks run], counted across calibration and timed samples
+    counts = [0, 0]
+
+    def run(iterations):
+        for _ in range(iterations):
+            for entity in entities:
+                counts[0] += len(select_events(entity, entities, dt, interval))
+        counts[1] += iterations * len(entities)
+        return iterations * len(entities)
+
+    with scaled_event_probabilities(args.event_scale):
+        iterations, total_ops, samples = measure(run, args.repeat, args.min_time)
+    return make_result("select", count, "entity_tick", iterations, total_ops, samples,
+                       extra={"events_per_entity_tick": counts[0] / counts[1]})
+
+
+def bench_socket_send(sink, args):
+    entities = make_entities(2, args.seed)
+    payloads = []
+    recorder = NullSocket()
+    with sender_socket(recorder):
+        for sender_name, arity in PDU_SENDERS:
+            getattr(sendPdu, sender_name)(*sender_args(arity, entities))
+            payloads.append(recorder.last_data)
+    address = (SINK_ADDRESS, sink.port)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        def run(iterations):
+            for _ in range(iterations):
+                for data in payloads:
+                    sock.sendto(data, address)
+            return iterations * len(payloads)
+
+        return make_result("socket_send", None, "pdu", *measure(run, args.repeat, args.min_time))
+    finally:
+        sock.close()
+
+
+def make_tick_runner(entities, dt, interval):
+    """
+    Returns run(iterations) calling sendPdu.simulate_tick. current_time is infinite so every
+    entity's EntityStatePdu is due on every tick, however long a tick takes in real time.
+    """
+    def run(iterations):
+        sent = 0
+        for _ in range(iterations):
+            sent += sendPdu.simulate_tick(entities, dt, float('inf'), interval)
+        return sent
+
+    return run
+
+
+def bench_e2e(count, sink, args):
+    entities = make_entities(count, args.seed)
+    interval = sendPdu.get_espdu_send_interval()
+    dt = sendPdu.get_tick_sleep_seconds(interval, count)
+    run = make_tick_runner(entities, dt, interval)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    try:
+        with sender_socket(sock), scaled_event_probabilities(args.event_scale):
+            iterations, total_ops, samples = measure(run, args.repeat, args.min_time)
+            if args.profile:
+                profile_e2e(count, run, iterations, args.profile)
+    finally:
+        sock.close()
+    pdus_per_tick = total_ops / (iterations * args.repeat)
+    if pdus_per_tick < count:
+        raise RuntimeError(f"e2e@{count} sent {pdus_per_tick:.2f} PDUs per tick; expected an EntityStatePdu for each of {count} entities.")
+    return make_result("e2e", count, "pdu", iterations, total_ops, samples,
+                       extra={"pdus_per_tick": pdus_per_tick,
+                              "ticks_per_sec_median": statistics.median(samples) / pdus_per_tick})
+
+
+def profile_e2e(count, run, iterations, profile_dir):
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, f"e2e_{count}")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    run(iterations)
+    profiler.disable()
+    profiler.dump_stats(base + ".prof")
+    with open(base + ".txt", "w") as report:
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(40)
+    print(f"Wrote {base}.prof and {base}.txt", file=sys.stderr)
+
+
+def result_key(result):
+    return f"{result['name']}@{result['entities']}" if result["entities"] is not None else result["name"]
+
+
+def check_regressions(results, config, baseline_path, max_regression_percent):
+    """
+    Returns a list of failure messages. A benchmark regresses when its median throughput is
+    more than the threshold below the baseline median; raise --repeat and --min-time to
+    reduce noise rather than widening the threshold.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Baseline {baseline_path} has schema_version {baseline.get('schema_version')}, expected {SCHEMA_VERSION}.")
+
+    failures = []
+    for key in COMPARABLE_CONFIG_KEYS:
+        if baseline["config"].get(key) != config[key]:
+            failures.append(f"config {key} differs: baseline {baseline['config'].get(key)!r}, current {config[key]!r}")
+    if failures:
+        return failures
+
+    baseline_by_key = {result_key(r): r for r in baseline["results"]}
+    current_keys = {result_key(r) for r in results}
+    for key in sorted(set(baseline_by_key) - current_keys):
+        print(f"Warning: baseline benchmark {key} was not run.", file=sys.stderr)
+
+    compared = 0
+    for result in results:
+        previous = baseline_by_key.get(result_key(result))
+        if not previous:
+            print(f"Warning: benchmark {result_key(result)} has no baseline entry.", file=sys.stderr)
+            continue
+        compared += 1
+        before = previous["ops_per_sec_median"]
+        after = result["ops_per_sec_median"]
+        result["baseline_ops_per_sec_median"] = before
+        result["change_percent"] = round((after - before) / before * 100.0 if before else 0.0, 2)
+        if result["change_percent"] < -max_regression_percent:
+            failures.append(f"{result_key(result)}: {before:,.0f} -> {after:,.0f} {result['unit']}/s ({result['change_percent']:+.1f}%)")
+    if not compared:
+        failures.append(f"no benchmarks matched the baseline in {baseline_path}")
+    return failures
+
+
+def parse_entity_counts(value):
+    try:
+        counts = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid entity counts: {value!r}")
+    if not counts or any(c < 1 for c in counts):
+        raise argparse.ArgumentTypeError("entity counts must be integers >= 1")
+    return counts
+
+
+def parse_positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be an integer >= 1")
+    return number
+
+
+def parse_non_negative_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if not number >= 0:
+        raise argparse.ArgumentTypeError("must be a number >= 0")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sendPdu.py sender against a local UDP sink.")
+    parser.add_argument("--entities", type=parse_entity_counts, default=DEFAULT_ENTITY_COUNTS,
+                        help="comma-separated entity counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=parse_positive_int, default=DEFAULT_REPEAT,
+                        help="timed samples per benchmark (default: %(default)s)")
+    parser.add_argument("--min-time", type=parse_non_negative_float, default=DEFAULT_MIN_TIME_SECONDS,
+                        help="minimum seconds per sample (default: %(default)s)")
+    parser.add_argument("--event-scale", type=parse_non_negative_float, default=DEFAULT_EVENT_SCALE,
+                        help="multiply sendPdu's event probabilities by this in the select and e2e stages "
+                             "(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help="random seed, reapplied at the start of every stage (default: %(default)s)")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--profile", metavar="DIR", help="write cProfile output for the e2e runs to DIR")
+    parser.add_argument("--baseline", help="JSON results from a previous run with the same settings to compare against")
+    parser.add_argument("--max-regression", type=parse_non_negative_float, default=DEFAULT_MAX_REGRESSION_PERCENT,
+                        help="fail if a benchmark's median throughput is more than this percent below the "
+                             "baseline median (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = []
+    with UdpSink() as sink, open(os.devnull, "w") as devnull:
+        sendPdu.DESTINATION_ADDRESS = SINK_ADDRESS
+        sendPdu.UDP_PORT = sink.port
+        # sendPdu prints a line per PDU; keep it in the measurement but off the terminal.
+        with contextlib.redirect_stdout(devnull):
+            results.extend(bench_build(args))
+            results.append(bench_socket_send(sink, args))
+            for count in args.entities:
+                results.append(bench_update(count, args))
+                results.append(bench_select(count, args))
+                results.append(bench_e2e(count, sink, args))
+
+    config = {
+        "entities": args.entities,
+        "repeat": args.repeat,
+        "min_time": args.min_time,
+        "event_scale": args.event_scale,
+        "seed": args.seed,
+    }
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "sink": {"packets": sink.packets, "bytes": sink.bytes},
+        "results": results,
+    }
+
+    failures = []
+    if sink.packets == 0:
+        failures.append("the UDP sink received no packets; the send path is broken")
+    if args.baseline:
+        failures.extend(check_regressions(results, config, args.baseline, args.max_regression))
+
+    for result in results:
+        change = f" ({result['change_percent']:+.1f}%)" if "change_percent" in result else ""
+        print(f"{result_key(result):<36} {result['ops_per_sec_median']:>14,.0f} {result['unit']}/s{change}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Wrote results to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if failures:
+        print("Benchmark check failed:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
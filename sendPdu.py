@@ -400,12 +400,89 @@ def send_emission_pdu(entity):
     print(f"Sent ElectromagneticEmissionsPdu from {entity['marking']} (TS: {pdu.timestamp}). {len(data)} bytes.")
 
 
+def select_events(entity, entities, dt, espdu_send_interval):
+    """Returns the (send function, args) pairs for the events an entity raises in one tick."""
+    event_scale = dt / espdu_send_interval if espdu_send_interval > 0 else 1.0
+    events = []
+
+    # Fire PDU - equally distributed with other PDU types
+    if random.random() < FIRE_EVENT_PROBABILITY * event_scale:
+        possible_targets = [e for e in entities if e["id_obj"].entityID != entity["id_obj"].entityID]
+        if possible_targets:
+            events.append((send_fire_pdu, (entity, random.choice(possible_targets))))
+
+    # Detonation PDU - now independent from Fire PDU
+    if random.random() < DETONATION_PDU_PROBABILITY * event_scale:
+        possible_targets = [e for e in entities if e["id_obj"].entityID != entity["id_obj"].entityID]
+        if possible_targets:
+            events.append((send_detonation_pdu, (entity, random.choice(possible_targets))))
+
+    # Collision PDU
+    if random.random() < COLLISION_EVENT_PROBABILITY * event_scale:
+        possible_collisions = [e for e in entities if e["id_obj"].entityID != entity["id_obj"].entityID]
+        if possible_collisions:
+            events.append((send_collision_pdu, (entity, random.choice(possible_collisions))))
+
+    # Data PDU
+    if random.random() < DATA_PDU_PROBABILITY * event_scale:
+        possible_targets = [e for e in entities if e["id_obj"].entityID != entity["id_obj"].entityID]
+        if possible_targets:
+            events.append((send_data_pdu, (entity, random.choice(possible_targets))))
+
+    # Action Request PDU
+    if random.random() < ACTION_REQUEST_PDU_PROBABILITY * event_scale:
+        possible_targets = [e for e in entities if e["id_obj"].entityID != entity["id_obj"].entityID]
+        if possible_targets:
+            events.append((send_action_request_pdu, (entity, random.choice(possible_targets))))
+
+    # Start Resume PDU
+    if random.random() < START_RESUME_PDU_PROBABILITY * event_scale:
+        events.append((send_start_resume_pdu, ()))
+
+    # Set Data PDU
+    if random.random() < SET_DATA_PDU_PROBABILITY * event_scale:
+        events.append((send_set_data_pdu, (entity,)))
+
+    # Designator PDU
+    if random.random() < DESIGNATOR_PDU_PROBABILITY * event_scale:
+        events.append((send_designator_pdu, (entity,)))
+
+    # Electromagnetic Emissions PDU
+    if random.random() < EMISSION_PDU_PROBABILITY * event_scale:
+        events.append((send_emission_pdu, (entity,)))
+
+    return events
+
+def get_espdu_send_interval():
+    """Seconds between EntityStatePdus for one entity."""
+    return 1.0 / PDUS_PER_SECOND_PER_ENTITY if PDUS_PER_SECOND_PER_ENTITY > 0 else float('inf')
+
+def get_tick_sleep_seconds(espdu_send_interval, num_entities):
+    """Seconds main() sleeps between ticks, which is also the typical dt of a tick."""
+    return max(0.01, espdu_send_interval / (num_entities if num_entities > 0 else 1) / 10.0)
+
+def simulate_tick(entities, dt, current_time, espdu_send_interval):
+    """Moves every entity, sends due EntityStatePdus and any selected events. Returns the PDUs sent."""
+    pdus_sent = 0
+    for entity in entities:
+        update_entity_position(entity, dt)
+
+        if current_time - entity.get("last_espdu_sent_time", 0) >= espdu_send_interval:
+            send_entity_state_pdu(entity)
+            pdus_sent += 1
+
+        for send_pdu, args in select_events(entity, entities, dt, espdu_send_interval):
+            send_pdu(*args)
+            pdus_sent += 1
+    return pdus_sent
+
+
 def main():
     initialize_entities()
     start_time = time.time()
     last_update_time = start_time
     total_pdus_sent = 0
-    espdu_send_interval = 1.0 / PDUS_PER_SECOND_PER_ENTITY if PDUS_PER_SECOND_PER_ENTITY > 0 else float('inf')
+    espdu_send_interval = get_espdu_send_interval()
 
     print(f"Starting DIS PDU simulation for {SIMULATION_DURATION_SECONDS} seconds.")
     print(f"Simulating {NUM_SIMULATED_ENTITIES} entities.")
@@ -422,74 +499,9 @@ def main():
             if not simulated_entities:
                 break
 
-            for entity in simulated_entities:
-                update_entity_position(entity, dt)
-
-                if current_time - entity.get("last_espdu_sent_time", 0) >= espdu_send_interval:
-                    send_entity_state_pdu(entity)
-                    total_pdus_sent += 1
-
-                # Fire PDU - equally distributed with other PDU types
-                if random.random() < FIRE_EVENT_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    possible_targets = [e for e in simulated_entities if e["id_obj"].entityID != entity["id_obj"].entityID]
-                    if possible_targets:
-                        target_entity = random.choice(possible_targets)
-                        send_fire_pdu(entity, target_entity)
-                        total_pdus_sent += 1
-                
-                # Detonation PDU - now independent from Fire PDU
-                if random.random() < DETONATION_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    possible_targets = [e for e in simulated_entities if e["id_obj"].entityID != entity["id_obj"].entityID]
-                    if possible_targets:
-                        target_entity = random.choice(possible_targets)
-                        send_detonation_pdu(entity, target_entity)
-                        total_pdus_sent += 1
-
-                # Collision PDU
-                if random.random() < COLLISION_EVENT_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    possible_collisions = [e for e in simulated_entities if e["id_obj"].entityID != entity["id_obj"].entityID]
-                    if possible_collisions:
-                        colliding_entity = random.choice(possible_collisions)
-                        send_collision_pdu(entity, colliding_entity)
-                        total_pdus_sent += 1
-
-                # Data PDU
-                if random.random() < DATA_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    possible_targets = [e for e in simulated_entities if e["id_obj"].entityID != entity["id_obj"].entityID]
-                    if possible_targets:
-                        target = random.choice(possible_targets)
-                        send_data_pdu(entity, target)
-                        total_pdus_sent += 1
-                
-                # Action Request PDU
-                if random.random() < ACTION_REQUEST_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    possible_targets = [e for e in simulated_entities if e["id_obj"].entityID != entity["id_obj"].entityID]
-                    if possible_targets:
-                        target = random.choice(possible_targets)
-                        send_action_request_pdu(entity, target)
-                        total_pdus_sent += 1
-                
-                # Start Resume PDU
-                if random.random() < START_RESUME_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    send_start_resume_pdu()
-                    total_pdus_sent += 1
-                
-                # Set Data PDU
-                if random.random() < SET_DATA_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    send_set_data_pdu(entity)
-                    total_pdus_sent += 1
-                
-                # Designator PDU
-                if random.random() < DESIGNATOR_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    send_designator_pdu(entity)
-                    total_pdus_sent += 1
-
-                # Electromagnetic Emissions PDU
-                if random.random() < EMISSION_PDU_PROBABILITY * (dt / espdu_send_interval if espdu_send_interval > 0 else 1.0):
-                    send_emission_pdu(entity)
-                    total_pdus_sent += 1
-
-            time.sleep(max(0.01, espdu_send_interval / (NUM_SIMULATED_ENTITIES if NUM_SIMULATED_ENTITIES > 0 else 1) / 10.0))
+            total_pdus_sent += simulate_tick(simulated_entities, dt, current_time, espdu_send_interval)
+
+            time.sleep(get_tick_sleep_seconds(espdu_send_interval, NUM_SIMULATED_ENTITIES))
 
     except KeyboardInterrupt:
         print("\nSimulation stopped by user.")